@@ -6,111 +6,257 @@ A target game:
         the amount of the same letter in the field
     - The words must contain the middle letter(the fifth one)
 """
+import os
+import pickle
 import random
+import sys
+from collections.abc import Iterable
+from functools import lru_cache
+from itertools import islice
 
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
 
-def generate_grid() -> list[list[str]]:
+# Each letter gets a 5-bit field in a packed letter count: 4 bits for the
+# amount and a guard bit on top that absorbs the borrow of a subtraction
+_GUARDS = sum(0b10000 << 5 * i for i in range(len(LETTERS)))
+
+# Part of the dictionary cache file name, bump on every change of its format
+_CACHE_VERSION = 6
+
+
+def generate_grid() -> tuple[str, ...]:
     """
     Generate a 3x3 grid of random letters
 
     Returns
     -------
-    list[list[str]]
-        The generated grid
+    tuple[str, ...]
+        The generated grid, row by row
+    """
+    return tuple(random.choices(LETTERS, k=9))
+
+
+def _pack_letters(letters) -> int:
+    """
+    Pack the amount of each letter into one integer
+
+    Parameters
+    ----------
+    letters
+        The letters to count, at most 15 of each
+
+    Returns
+    -------
+    int
+        The packed amounts, 5 bits per letter from "a" upwards
+    """
+    return sum(1 << 5 * (ord(letter) - ord("a")) for letter in letters)
+
+
+def _letter_mask(letters) -> int:
+    """
+    Get the set of letters as a bitmask
+
+    Parameters
+    ----------
+    letters
+        The letters to put into the mask
+
+    Returns
+    -------
+    int
+        The mask with one bit per letter from "a" upwards
+    """
+    return sum(1 << ord(letter) - ord("a") for letter in set(letters))
+
+
+def _index_words(
+    words: Iterable[tuple[str, int]]
+) -> dict[int, list[tuple[int, str, int]]]:
+    """
+    Group the words by the set of letters they consist of
+
+    Parameters
+    ----------
+    words : Iterable[tuple[str, int]]
+        The words with their packed letter amounts
+
+    Returns
+    -------
+    dict[int, list[tuple[int, str, int]]]
+        The position of each word, the word and its packed letter amounts
+        by its letter mask
     """
-    letters = "abcdefghijklmnopqrstuvwxyz"
-    grid: list[list] = []
-    for i in range(3):
-        grid.append([])
-        for _ in range(3):
-            grid[i].append(random.choice(letters))
-    return grid
+    index: dict[int, list[tuple[int, str, int]]] = {}
+    for position, (word, letter_amounts) in enumerate(words):
+        index.setdefault(_letter_mask(word), []).append(
+            (position, word, letter_amounts)
+        )
+    return index
 
 
-def get_words(file: str, letters: list) -> list[str]:
+def _load_dictionary(path: str) -> dict[int, list[tuple[int, str, int]]]:
+    """
+    Load the words from the dictionary file
+
+    Only the distinct words of 4 to 9 letters are kept, as no other word
+    can be made from the grid, each with its packed letter amounts and
+    grouped by its letter mask. The index is cached in a pickle file next
+    to the dictionary and reused while it is newer than the dictionary.
+
+    Parameters
+    ----------
+    path : str
+        The dictionary file to read the words from
+
+    Returns
+    -------
+    dict[int, list[tuple[int, str, int]]]
+        The lowercased words of 4 to 9 letters from the dictionary with
+        their positions and packed letter amounts by their letter mask
+    """
+    cache = f"{path}.v{_CACHE_VERSION}.pkl"
+    if os.path.exists(cache) and os.path.getmtime(cache) >= os.path.getmtime(path):
+        try:
+            with open(cache, "rb") as cached:
+                return pickle.load(cached)
+        except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+            pass  # A broken cache is rebuilt below
+    with open(path, encoding="utf-8") as dictionary:
+        # Words differing only in case become duplicates once lowercased
+        words = _index_words(
+            (word, _pack_letters(word))
+            for word in dict.fromkeys(
+                word
+                for word in (
+                    line.rstrip().lower() for line in islice(dictionary, 3, None)
+                )
+                if 4 <= len(word) <= 9 and word.isascii() and word.isalpha()
+            )
+        )
+    # Write to a temporary file first so an interrupted run never leaves
+    # a truncated cache behind
+    temp = f"{cache}.{os.getpid()}.tmp"
+    try:
+        with open(temp, "wb") as cached:
+            pickle.dump(words, cached, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, cache)
+    except OSError:
+        # The game runs without a cache, e.g. next to a read-only dictionary
+        try:
+            os.remove(temp)
+        except OSError:
+            pass
+    return words
+
+
+def get_words(
+    words: dict[int, list[tuple[int, str, int]]], letters: tuple[str, ...]
+) -> list[str]:
     """
     Get all possible  words that consist of these letters
 
     Parameters
     ----------
-    file : str
-        The file to read the words from
-    letters : list
+    words : dict[int, list[tuple[int, str, int]]]
+        The lowercased words of 4 to 9 letters from the dictionary with
+        their positions and packed letter amounts by their letter mask
+    letters : tuple[str, ...]
         The letters to use
 
     Returns
     -------
     list
-        The words that consist of these letters
-    """
-    with open(file, encoding="utf-8") as dictionary:
-        words = dictionary.read().splitlines()[3:]
-        valid_words = []
-        letter_amounts = _get_letter_amounts(letters)
-        middle_letter = letters[4]
-        for word in words:
-            word = word.lower()
-            if len(word) >= 4 and set(word).issubset([i[0] for i in letter_amounts]):
-                if (
-                    all(
-                        word.count(i) <= _find_amount_by_letter(
-                            i, letter_amounts)
-                        for i in word
-                    )
-                    and middle_letter in word
-                ):
-                    valid_words.append(word)
-        return valid_words
-
-
-def _get_letter_amounts(letters: list) -> list[tuple]:
-    """
-    Get the amount of each letter in the letters list
+        The words that consist of these letters, in dictionary order
+    """
+    valid_words = []
+    # A field keeps its guard bit only if the grid has enough of the letter
+    grid_amounts = _pack_letters(letters) | _GUARDS
+    middle = _letter_mask(letters[4])
+    others = _letter_mask(letters) & ~middle
+    # Walk every subset of the other grid letters, the words of each one
+    # together with the middle letter can only miss on the letter amounts
+    subset = others
+    while True:
+        for position, word, letter_amounts in words.get(subset | middle, ()):
+            if (grid_amounts - letter_amounts) & _GUARDS == _GUARDS:
+                valid_words.append((position, word))
+        if not subset:
+            return [word for _, word in sorted(valid_words)]
+        subset = (subset - 1) & others
+
+
+@lru_cache(maxsize=16)
+def _letter_amounts(grid_key: tuple[str, ...]) -> tuple[int, ...]:
+    """
+    Get the amount of each letter of the grid
 
     Parameters
     ----------
-    letters : list
-        The letters to get the amount of
+    grid_key : tuple[str, ...]
+        The sorted letters of the grid
 
     Returns
     -------
-    list[tuple[]]
-        The amount of each letter
+    tuple[int, ...]
+        The amount of each letter from "a" upwards
     """
-    letter_amounts: list[list] = []
-    for letter in letters:
-        i = 0
-        found = False
-        while i < len(letter_amounts):
-            if letter in letter_amounts[i]:
-                letter_amounts[i][1] += 1
-                found = True
-            i += 1
-        if not found:
-            letter_amounts.append([letter, 1])
-    return [tuple(i) for i in letter_amounts]
+    return tuple(grid_key.count(letter) for letter in LETTERS)
 
 
-def _find_amount_by_letter(letter: str, letter_list: list[tuple]) -> int:
+def _fits(word: str, grid_hist: tuple[int, ...]) -> bool:
     """
-    Find the amount of a letter from a list of tuple
+    Check whether the grid has enough of each letter of the word
+
+    Stops at the first letter that the grid runs out of.
 
     Parameters
     ----------
-    letter : str
-        The letter to find the amount of
-    letter_list : list[tuple[]]
-        The list to find the letter amount in
+    word : str
+        The word to check
+    grid_hist : tuple[int, ...]
+        The amount of each letter of the grid from "a" upwards
 
     Returns
     -------
-    int
-        The amount of the letter taken from list
+    bool
+        Whether the word can be made from the letters of the grid
+    """
+    local = [0] * len(LETTERS)
+    for letter in word:
+        idx = ord(letter) - ord("a")
+        if not 0 <= idx < len(LETTERS):
+            return False
+        local[idx] += 1
+        if local[idx] > grid_hist[idx]:
+            return False
+    return True
+
+
+@lru_cache(maxsize=1024)
+def _word_ok(word: str, grid_key: tuple[str, ...], middle_letter: str) -> bool:
     """
-    for i in letter_list:
-        if i[0] == letter:
-            return i[1]
-    return 0
+    Check whether the word follows the rules of the game
+
+    Parameters
+    ----------
+    word : str
+        The word to check
+    grid_key : tuple[str, ...]
+        The sorted letters of the grid
+    middle_letter : str
+        The letter the word must contain
+
+    Returns
+    -------
+    bool
+        Whether the word can be made from the grid
+    """
+    return (
+        len(word) >= 4
+        and middle_letter in word
+        and _fits(word, _letter_amounts(grid_key))
+    )
 
 
 def get_user_words():
@@ -119,12 +265,15 @@ def get_user_words():
     Usage: enter a word or press ctrl+d to finish for *nix or Ctrl-Z+Enter
     for Windows.
     Note: the user presses the enter key after entering each word.
+    When the input is not a terminal, it is read at once without prompts.
 
     Returns
     -------
     list
         The words entered by the user
     """
+    if not sys.stdin.isatty():
+        return sys.stdin.read().split()
     user_words = []
     while True:
         try:
@@ -134,7 +283,7 @@ def get_user_words():
 
 
 def get_pure_user_words(
-    user_words: list[str], letters: list[str], words_from_dict: list[str]
+    user_words: list[str], letters: tuple[str, ...], words_from_dict: set[str]
 ) -> list[str]:
     """
     Checks user words with the rules and returns list of those words
@@ -144,9 +293,9 @@ def get_pure_user_words(
     ----------
     user_words : list[str]
         The words entered by the user
-    letters : list[str]
+    letters : tuple[str, ...]
         The letters to use
-    words_from_dict : list[str]
+    words_from_dict : set[str]
         The words from the dictionary
 
     Returns
@@ -154,83 +303,62 @@ def get_pure_user_words(
     list[str]
         The words entered by the user that are not in dictionary
     """
-    letter_amounts = _get_letter_amounts(letters)
+    grid_key = tuple(sorted(letters))
     middle_letter = letters[4]
     pure_user_words = []
     for word in user_words:
-        if (
-            len(word) >= 4
-            and set(word).issubset([i[0] for i in letter_amounts])
-            and all(
-                word.count(i) <= _find_amount_by_letter(i, letter_amounts) for i in word
-            )
-            and middle_letter in word
-            and word not in words_from_dict
-        ):
+        if _word_ok(word, grid_key, middle_letter) and word not in words_from_dict:
             pure_user_words.append(word)
     return pure_user_words
 
 
 def results(
-    grid: list[list[str]], user_words: list[str], words_from_dict: list[str]
+    grid: tuple[str, ...], user_words: list[str], words_from_dict: list[str]
 ) -> None:
     """
     Prints the results of the game
 
     Parameters
     ----------
-    grid : list[list[str]]
-        The grid of letters
+    grid : tuple[str, ...]
+        The grid of letters, row by row
     user_words : list[str]
         The words entered by the user
     words_from_dict : list[str]
         The words from the dictionary
     """
-    print()
-    with open("results.txt", "w", encoding="utf-8") as file:
-        print("Possible words:")
-        for i in words_from_dict:
-            print(f"  {i}")
-        print("User words:")
-        for i in user_words:
-            print(f"  {i}")
-        pure_user_words = get_pure_user_words(
-            user_words, [i for j in grid for i in j], words_from_dict
+    dict_set = set(words_from_dict)
+    user_set = set(user_words)
+    pure_user_words = get_pure_user_words(user_words, grid, dict_set)
+    print(
+        "\n".join(
+            [
+                "",
+                "Possible words:",
+                *(f"  {i}" for i in words_from_dict),
+                "User words:",
+                *(f"  {i}" for i in user_words),
+                "Pure user words:",
+                *(f"  {i}" for i in pure_user_words),
+                "",
+            ]
         )
-        print("Pure user words:")
-        for i in pure_user_words:
-            print(f"  {i}")
-        print("")
-        _write_and_print(file, "Results")
-        _write_and_print(file, "-------")
-        _write_and_print(
-            file, f"Correct words: {sum(i in words_from_dict for i in user_words)}"
-        )
-        _write_and_print(file, "Possible words:")
-        for i in words_from_dict:
-            _write_and_print(file, f"  {i}")
-        _write_and_print(file, "Forgotten words:")
-        for i in words_from_dict:
-            if i not in user_words:
-                _write_and_print(file, f"  {i}")
-        _write_and_print(file, "Unknown user words:")
-        for i in pure_user_words:
-            _write_and_print(file, f"  {i}")
-
-
-def _write_and_print(file, text: str) -> None:
-    """
-    Writes text to a file and prints it
-
-    Parameters
-    ----------
-    file
-        The file to write to
-    text : str
-        The text to write
-    """
-    file.write(f"{text}\n")
-    print(text)
+    )
+    lines = [
+        "Results",
+        "-------",
+        f"Correct words: {sum(i in dict_set for i in user_words)}",
+        "Possible words:",
+        *(f"  {i}" for i in words_from_dict),
+        "Forgotten words:",
+        *(f"  {i}" for i in words_from_dict if i not in user_set),
+        "Unknown user words:",
+        *(f"  {i}" for i in pure_user_words),
+    ]
+    payload = "\n".join(lines) + "\n"
+    with open("results.txt", "w", encoding="utf-8") as file:
+        file.write(payload)
+    sys.stdout.write(payload)
 
 
 def main():
@@ -238,9 +366,9 @@ def main():
     The main function
     """
     grid = generate_grid()
-    for i in grid:
-        print(*i)
-    words_from_dict = get_words("en", [i for j in grid for i in j])
+    for row in range(0, 9, 3):
+        print(*grid[row : row + 3])
+    words_from_dict = get_words(_load_dictionary("en"), grid)
     user_words = get_user_words()
     results(grid, user_words, words_from_dict)
 
@@ -0,0 +1,185 @@
+"""
+Tests for the target game
+"""
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from collections import Counter
+from unittest import mock
+
+import target_game
+
+DICTIONARY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "en")
+
+
+def _reference_words(path: str, letters: tuple[str, ...]) -> list[str]:
+    """
+    Get the possible words with a plain scan over the dictionary
+
+    Parameters
+    ----------
+    path : str
+        The dictionary file to read the words from
+    letters : tuple[str, ...]
+        The letters to use
+
+    Returns
+    -------
+    list[str]
+        The words that consist of these letters, in dictionary order
+    """
+    letter_amounts = Counter(letters)
+    with open(path, encoding="utf-8") as dictionary:
+        words = dictionary.read().lower().splitlines()[3:]
+    return [
+        word
+        for word in dict.fromkeys(words)
+        if len(word) >= 4
+        and letters[4] in word
+        and not Counter(word) - letter_amounts
+    ]
+
+
+class GetWordsTest(unittest.TestCase):
+    """
+    Compare get_words with the plain scan on fixed grids
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        # Keep the dictionary cache out of the repository
+        cls.tempdir = tempfile.mkdtemp()
+        path = os.path.join(cls.tempdir, "en")
+        shutil.copyfile(DICTIONARY, path)
+        cls.words = target_game._load_dictionary(path)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tempdir)
+
+    def check(self, grid: str):
+        letters = tuple(grid)
+        self.assertEqual(
+            target_game.get_words(self.words, letters),
+            _reference_words(DICTIONARY, letters),
+        )
+
+    def test_distinct_letters(self):
+        self.check("aeinrstlo")
+
+    def test_repeated_letters(self):
+        self.check("eeassrtno")
+
+    def test_repeated_middle_letter(self):
+        self.check("rejnerdsj")
+
+    def test_no_words(self):
+        self.check("sbqgbcnnc")
+
+
+class GetPureUserWordsTest(unittest.TestCase):
+    """
+    Check the rules applied to the words of the user
+    """
+
+    def test_repeated_letters(self):
+        letters = tuple("eeassrtno")
+        user_words = ["seas", "tresses", "sees", "assess", "sneer", "onset"]
+        letter_amounts = Counter(letters)
+        self.assertEqual(
+            target_game.get_pure_user_words(user_words, letters, set()),
+            [
+                word
+                for word in user_words
+                if "s" in word and not Counter(word) - letter_amounts
+            ],
+        )
+
+    def test_middle_letter(self):
+        self.assertEqual(
+            target_game.get_pure_user_words(
+                ["tone", "rest"], tuple("aeinrstlo"), set()
+            ),
+            ["rest"],
+        )
+
+    def test_invalid_characters(self):
+        self.assertEqual(
+            target_game.get_pure_user_words(
+                ["Rest", "re-st", "rést", "rest1", "rest"], tuple("aeinrstlo"), set()
+            ),
+            ["rest"],
+        )
+
+    def test_dictionary_words(self):
+        self.assertEqual(
+            target_game.get_pure_user_words(
+                ["star", "rest"], tuple("aeinrstlo"), {"star"}
+            ),
+            ["rest"],
+        )
+
+    def test_same_letters_other_middle(self):
+        self.assertEqual(
+            target_game.get_pure_user_words(["rose"], tuple("aeinrstlo"), set()),
+            ["rose"],
+        )
+        self.assertEqual(
+            target_game.get_pure_user_words(["rose"], tuple("aeintsrlo"), set()),
+            [],
+        )
+
+
+class GetUserWordsTest(unittest.TestCase):
+    """
+    Check reading the words of the user
+    """
+
+    def test_piped_input(self):
+        with mock.patch.object(
+            target_game.sys, "stdin", io.StringIO("rest\n\nstar tars\n  rats\n")
+        ):
+            self.assertEqual(
+                target_game.get_user_words(), ["rest", "star", "tars", "rats"]
+            )
+
+
+class LoadDictionaryTest(unittest.TestCase):
+    """
+    Check that the dictionary cache is optional
+    """
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tempdir, "en")
+        with open(self.path, "w", encoding="utf-8") as dictionary:
+            dictionary.write("Wordlists\n#en: English\n#\nrest\nstar\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_failed_cache_write(self):
+        with mock.patch.object(
+            target_game.pickle, "dump", side_effect=OSError("No space left")
+        ):
+            words = target_game._load_dictionary(self.path)
+        self.assertEqual(
+            target_game.get_words(words, tuple("aeinrstlo")), ["rest", "star"]
+        )
+        self.assertEqual(os.listdir(self.tempdir), ["en"])
+
+    def test_short_file(self):
+        with open(self.path, "w", encoding="utf-8") as dictionary:
+            dictionary.write("Wordlists\n")
+        self.assertEqual(
+            target_game.get_words(
+                target_game._load_dictionary(self.path), tuple("aeinrstlo")
+            ),
+            [],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()